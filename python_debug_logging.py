@@ -6,11 +6,35 @@
 3. 実践例
 """
 
+import atexit
+import functools
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+import weakref
 from pathlib import Path
 
+# スレッド名・プロセス情報はフォーマットで使わないので収集しない
+logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+
+# ログディレクトリ（作成は起動時に1回だけ）
+_LOG_DIR = Path("logs")
+_LOG_DIR.mkdir(exist_ok=True)
+
+
+# 日別ログファイル名に使う日付（起動時に1回だけ作る。日付が変わっても同じファイルに書く）
+_TODAY = time.strftime('%Y%m%d')
+
+
+@functools.lru_cache(maxsize=None)
+def _log_file_for(name: str, day: str) -> Path:
+    """ロガー名と日付からログファイルのパスを返す"""
+    return _LOG_DIR / f"{name}_{day}.log"
+
 
 # ============================================================
 # 1. デバッグツールのインストール方法
@@ -29,6 +53,8 @@ pip install pudb          # ビジュアルデバッガ
 pip install loguru        # 簡単で強力なロギング
 pip install icecream      # デバッグプリント改善
 pip install coloredlogs   # ログに色付け
+pip install numba         # 数値計算のJITコンパイル（任意）
+pip install "liburing>=2026.3.30"  # io_uringでログ書き込み（Linux、任意）
 
 ■ VSCodeでのデバッグ
 - VSCode標準機能を使用（拡張機能不要）
@@ -66,6 +92,195 @@ def basic_logging_example():
 # 3. ファイルにログを保存
 # ============================================================
 
+# 定期フラッシュするハンドラ（1本のスレッドで全ハンドラをフラッシュする）
+_FLUSH_HANDLERS = weakref.WeakSet()
+_flush_lock = threading.Lock()
+_flush_thread = None
+
+
+def _flush_loop():
+    """登録されたハンドラを、それぞれの間隔でフラッシュし続ける"""
+    while True:
+        now = time.monotonic()
+        wait = 1.0
+        with _flush_lock:
+            handlers = list(_FLUSH_HANDLERS)
+        for handler in handlers:
+            if now >= handler._next_flush:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass  # 書けなかった分は次回に再試行
+                handler._next_flush = now + handler._flush_interval
+            wait = min(wait, handler._next_flush - now)
+        del handlers
+        time.sleep(max(wait, 0.01))
+
+
+def _register_flush(handler, interval: float):
+    """interval秒ごとに handler.flush() を呼ぶよう登録する（0以下なら何もしない）"""
+    global _flush_thread
+    if interval <= 0:
+        return
+    handler._flush_interval = interval
+    handler._next_flush = time.monotonic() + interval
+    with _flush_lock:
+        _FLUSH_HANDLERS.add(handler)
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(target=_flush_loop, daemon=True)
+            _flush_thread.start()
+
+
+def _unregister_flush(handler):
+    """定期フラッシュの対象から外す"""
+    with _flush_lock:
+        _FLUSH_HANDLERS.discard(handler)
+
+
+class _BufferedFileHandler(logging.StreamHandler):
+    """バッファ付きファイルハンドラ
+
+    logging.FileHandler は1レコードごとに write() するため、
+    64KiBのバッファにまとめて書き込み、一定間隔でフラッシュする。
+    終了時のフラッシュは logging.shutdown()（atexit登録済み）が close() を呼ぶ。
+    """
+
+    def __init__(self, path, bufsize: int = 65536, flush_interval: float = 1.0):
+        stream = open(path, 'a', buffering=bufsize, encoding='utf-8')
+        super().__init__(stream)
+        _register_flush(self, flush_interval)
+
+    def close(self):
+        """定期フラッシュから外してファイルを閉じる"""
+        self.acquire()
+        try:
+            _unregister_flush(self)
+            try:
+                self.flush()
+            finally:
+                stream = self.stream
+                self.stream = None
+                if stream is not None:
+                    stream.close()
+                super().close()
+        finally:
+            self.release()
+
+
+def _make_buffered_file_handler(path, bufsize: int = 65536,
+                                flush_interval: float = 1.0):
+    """バッファ付きファイルハンドラを作る
+
+    Args:
+        path: ログファイルのパス
+        bufsize: バッファサイズ（バイト）
+        flush_interval: 定期フラッシュの間隔（秒、0以下で無効）
+    """
+    return _BufferedFileHandler(path, bufsize=bufsize, flush_interval=flush_interval)
+
+
+class UringHandler(logging.Handler):
+    """io_uring でまとめて書き込むファイルハンドラ（Linux専用）
+
+    レコードをバッファに貯め、bufsize を超えるか flush_interval 秒ごとに
+    1回の io_uring 送信でファイルに書き込む。
+    Ring / Cqe API の liburing（pip install "liburing>=2026.3.30"）が必要。
+    """
+
+    def __init__(self, path, bufsize: int = 65536, flush_interval: float = 1.0,
+                 encoding: str = 'utf-8'):
+        super().__init__()
+        self._encoding = encoding
+        self._bufsize = bufsize
+        self._buffer = bytearray()
+        self._ring = None
+        self._fd = None
+        try:
+            import liburing
+            self._uring = liburing
+            ring = liburing.Ring()
+            self._cqe = liburing.Cqe()
+            liburing.io_uring_queue_init(8, ring)
+            self._ring = ring
+            # O_APPEND なのでオフセットに関係なく末尾に追記される
+            self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except BaseException:
+            # 作りかけのまま logging.shutdown() に残さない
+            self.close()
+            raise
+        _register_flush(self, flush_interval)
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + '\n').encode(self._encoding)
+            self.acquire()
+            try:
+                self._buffer += data
+                if len(self._buffer) >= self._bufsize:
+                    self._submit()
+            finally:
+                self.release()
+        except Exception:
+            self.handleError(record)
+
+    def _submit(self):
+        """バッファの内容を io_uring で書き込む（ロック取得済みで呼ぶ）
+        
+        書き込めた分だけバッファから消すので、失敗しても残りは次回に再送される
+        """
+        uring = self._uring
+        while self._buffer:
+            data = bytes(self._buffer)
+            sqe = uring.io_uring_get_sqe(self._ring)
+            uring.io_uring_prep_write(sqe, self._fd, data, len(data), 0)
+            uring.io_uring_submit(self._ring)
+            uring.io_uring_wait_cqe(self._ring, self._cqe)
+            written = self._cqe.res
+            uring.io_uring_cqe_seen(self._ring, self._cqe)
+            if written < 0:
+                raise OSError(-written, os.strerror(-written))
+            del self._buffer[:written]
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer and self._fd is not None:
+                self._submit()
+        finally:
+            self.release()
+
+    def close(self):
+        """残りを書き込んでファイルと io_uring を閉じる"""
+        self.acquire()
+        try:
+            _unregister_flush(self)
+            try:
+                self.flush()
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                if self._ring is not None:
+                    self._uring.io_uring_queue_exit(self._ring)
+                    self._ring = None
+                super().close()
+        finally:
+            self.release()
+
+
+def _make_uring_file_handler(path, bufsize: int = 65536,
+                             flush_interval: float = 1.0):
+    """io_uring ハンドラを作る（使えない環境ではバッファ付きハンドラで代用）"""
+    if sys.platform == 'linux':
+        try:
+            return UringHandler(path, bufsize=bufsize, flush_interval=flush_interval)
+        except Exception:
+            # liburing が無い・APIが違う・io_uring が使えない場合
+            pass
+    return _make_buffered_file_handler(path, bufsize=bufsize,
+                                       flush_interval=flush_interval)
+
+
 def file_logging_example():
     """ログをファイルに保存する"""
     
@@ -73,19 +288,15 @@ def file_logging_example():
     print("ファイルロギング")
     print("="*60)
     
-    # ログディレクトリ作成
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    # ログファイル名（日時付き）
-    log_file = log_dir / f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    # ログファイル名（日時付き、ディレクトリは作成済み）
+    log_file = _LOG_DIR / f"app_{time.strftime('%Y%m%d_%H%M%S')}.log"
     
     # ロガーの設定
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.DEBUG)
     
-    # ファイルハンドラ
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # ファイルハンドラ（バッファ付き）
+    file_handler = _make_buffered_file_handler(log_file)
     file_handler.setLevel(logging.DEBUG)
     
     # コンソールハンドラ
@@ -119,69 +330,200 @@ def file_logging_example():
 # 4. 実践的なロガークラス
 # ============================================================
 
+# 呼び出し元のフレーム情報が必要なフォーマット項目
+_CALLER_FIELDS = ('%(funcName)', '%(pathname)', '%(filename)', '%(module)', '%(lineno)')
+
+
+def _unknown_caller(*args, **kwargs):
+    """findCaller の代わり（フレームをたどらない）"""
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+def _needs_caller_info(handlers) -> bool:
+    """いずれかのハンドラのフォーマットが呼び出し元情報を使うか"""
+    for handler in handlers:
+        fmt = handler.formatter._fmt if handler.formatter else None
+        if fmt and any(field in fmt for field in _CALLER_FIELDS):
+            return True
+    return False
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """時刻文字列を1秒単位でキャッシュするフォーマッター
+    
+    strftime() は重いので、秒が変わったときだけ作り直す。
+    複数のリスナースレッドで共有するため、(秒, 文字列) を1つのタプルで持つ
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache = (None, "")
+    
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        cached_sec, cached_str = self._cache
+        if sec != cached_sec:
+            cached_str = time.strftime(
+                datefmt or self.default_time_format, self.converter(record.created)
+            )
+            self._cache = (sec, cached_str)
+        if datefmt:
+            return cached_str
+        return self.default_msec_format % (cached_str, record.msecs)
+
+
+# 全ハンドラで共有するフォーマッター
+_CONSOLE_FMT = _CachedTimeFormatter(
+    '%(asctime)s [%(levelname)s] %(message)s',
+    datefmt='%H:%M:%S'
+)
+# strftime を避けて UNIX 時刻（秒.ミリ秒）をそのまま出す
+_FILE_FMT = logging.Formatter(
+    '%(created).3f [%(levelname)s] %(funcName)s:%(lineno)d - %(message)s'
+)
+
+
+# 設定済みのロガー（name ごとに1つ）
+_LOGGER_CACHE: dict[str, "AppLogger"] = {}
+
+
 class AppLogger:
     """アプリケーション用ロガークラス
     
+    同じ name で作ると設定済みのインスタンスを返す（設定が違う場合は ValueError）。
+    close() は作った回数だけ呼び、最後の close() でハンドラが閉じられる
+    
     使い方:
         logger = AppLogger("MyApp")
         logger.info("アプリ起動")
     """
     
-    def __init__(self, name: str = "App", log_to_file: bool = True):
+    def __new__(cls, name: str = "App", log_to_file: bool = True,
+                use_uring: bool = False):
+        cached = _LOGGER_CACHE.get(name)
+        if cached is None:
+            return super().__new__(cls)
+        if cached._config != (log_to_file, use_uring):
+            raise ValueError(f"ロガー {name!r} は別の設定で作成済みです")
+        return cached
+    
+    def __init__(self, name: str = "App", log_to_file: bool = True,
+                 use_uring: bool = False):
         """
         Args:
             name: ロガー名
             log_to_file: ファイルにも出力するか
+            use_uring: ファイル書き込みに io_uring を使うか（Linux、liburingが必要）
         """
+        # キャッシュから返されたインスタンスは設定済み（利用者数だけ増やす）
+        if '_config' in self.__dict__:
+            self._refs += 1
+            return
+        
+        self._name = name
+        self._config = (log_to_file, use_uring)
+        self._refs = 1
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
         
-        # 既存のハンドラをクリア
-        self.logger.handlers.clear()
+        # 実際の出力先（コンソール・ファイル）はバックグラウンドスレッドが担当
+        handlers = []
         
         # コンソールハンドラ
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
-        console_format = logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(message)s',
-            datefmt='%H:%M:%S'
-        )
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
+        console_handler.setFormatter(_CONSOLE_FMT)
+        handlers.append(console_handler)
         
         # ファイルハンドラ（オプション）
         if log_to_file:
-            log_dir = Path("logs")
-            log_dir.mkdir(exist_ok=True)
-            log_file = log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
+            log_file = _log_file_for(name, _TODAY)
             
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            if use_uring:
+                file_handler = _make_uring_file_handler(log_file)
+            else:
+                file_handler = _make_buffered_file_handler(log_file)
             file_handler.setLevel(logging.DEBUG)
-            file_format = logging.Formatter(
-                '%(asctime)s [%(levelname)s] %(funcName)s:%(lineno)d - %(message)s'
-            )
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
-    
-    def debug(self, message: str):
+            file_handler.setFormatter(_FILE_FMT)
+            handlers.append(file_handler)
+        
+        # 呼び出し元情報を使わないなら sys._getframe() のたどりを省く
+        if _needs_caller_info(handlers):
+            self.logger.__dict__.pop('findCaller', None)
+        else:
+            self.logger.findCaller = _unknown_caller
+        
+        # 呼び出し側はキューに積むだけ（整形・書き込みはリスナーが行う）
+        self._queue = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        self.logger.addHandler(self._queue_handler)
+        self._listener = logging.handlers.QueueListener(
+            self._queue, *handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._shutdown)
+        
+        # どのハンドラも受け取らないレベルは呼び出し前に捨てる
+        self._effective_level = min(h.level for h in handlers)
+        # ルートロガーのハンドラまで伝搬させない
+        self.logger.propagate = False
+        
+        _LOGGER_CACHE[name] = self
+    
+    def close(self):
+        """利用をやめる（最後の利用者が閉じたときだけハンドラを閉じる）"""
+        if self._refs == 0:
+            return
+        self._refs -= 1
+        if self._refs == 0:
+            self._shutdown()
+    
+    def _shutdown(self):
+        """キューに残ったログを書き出し、ハンドラを閉じてキャッシュから外す"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self.logger.removeHandler(self._queue_handler)
+        if _LOGGER_CACHE.get(self._name) is self:
+            del _LOGGER_CACHE[self._name]
+        atexit.unregister(self._shutdown)
+    
+    def isEnabledFor(self, level: int) -> bool:
+        """指定レベルのログが出力されるか"""
+        return level >= self._effective_level and self.logger.isEnabledFor(level)
+    
+    def debug(self, message: str, *args):
         """デバッグログ"""
-        self.logger.debug(message)
+        if logging.DEBUG < self._effective_level:
+            return
+        self.logger.debug(message, *args)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """情報ログ"""
-        self.logger.info(message)
+        if logging.INFO < self._effective_level:
+            return
+        self.logger.info(message, *args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """警告ログ"""
-        self.logger.warning(message)
+        if logging.WARNING < self._effective_level:
+            return
+        self.logger.warning(message, *args)
     
-    def error(self, message: str, exc_info: bool = False):
+    def error(self, message: str, *args, exc_info: bool = False):
         """エラーログ"""
-        self.logger.error(message, exc_info=exc_info)
+        if logging.ERROR < self._effective_level:
+            return
+        self.logger.error(message, *args, exc_info=exc_info)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args, exc_info: bool = False):
         """致命的エラーログ"""
-        self.logger.critical(message)
+        if logging.CRITICAL < self._effective_level:
+            return
+        self.logger.critical(message, *args, exc_info=exc_info)
 
 
 # ============================================================
@@ -200,7 +542,7 @@ def error_handling_with_logging():
     def divide(a: float, b: float) -> float:
         """割り算（エラー処理付き）"""
         try:
-            logger.debug(f"計算開始: {a} ÷ {b}")
+            logger.debug("計算開始: %s ÷ %s", a, b)
             result = a / b
             logger.info(f"計算成功: {a} ÷ {b} = {result}")
             return result
@@ -218,37 +560,102 @@ def error_handling_with_logging():
     
     # エラーケース
     divide(10, 0)
+    
+    # 次の説明を表示する前にログを書き出す
+    logger.close()
 
 
 # ============================================================
 # 6. デコレータを使ったロギング
 # ============================================================
 
-def log_function_call(logger: AppLogger):
-    """関数呼び出しを自動ログ出力するデコレータ"""
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            logger.info(f"関数 {func.__name__} 開始")
-            logger.debug(f"  引数: args={args}, kwargs={kwargs}")
-            
-            try:
-                result = func(*args, **kwargs)
-                logger.info(f"関数 {func.__name__} 成功")
-                logger.debug(f"  戻り値: {result}")
-                return result
-            
-            except Exception as e:
-                logger.error(f"関数 {func.__name__} でエラー: {e}", exc_info=True)
-                raise
+def log_function_call(func):
+    """関数呼び出しを自動ログ出力するデコレータ
+    
+    環境変数 APP_TRACE が設定されているときだけラップする（それ以外は元の関数のまま）。
+    メソッドなら self.logger に、それ以外はモジュールのロガーに出力する。
+    """
+    if not os.environ.get('APP_TRACE'):
+        return func
+    
+    module_logger = logging.getLogger(func.__module__)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        logger = getattr(args[0], 'logger', None) if args else None
+        if not isinstance(logger, AppLogger):
+            logger = module_logger
+        if not logger.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
         
-        return wrapper
-    return decorator
+        logger.info("関数 %s 開始", func.__name__)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  引数: args=%r, kwargs=%r", args, kwargs)
+        
+        try:
+            result = func(*args, **kwargs)
+            logger.info("関数 %s 成功", func.__name__)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  戻り値: %r", result)
+            return result
+        
+        except Exception as e:
+            logger.error("関数 %s でエラー: %s", func.__name__, e, exc_info=True)
+            raise
+    
+    return wrapper
 
 
 # ============================================================
 # 7. 実践例: うさうさ店長のふわふわ大福店
 # ============================================================
 
+def _cache_misses(dispatcher) -> int:
+    """ディスクキャッシュに無く、実際にコンパイルした回数"""
+    return sum(dispatcher.stats.cache_misses.values())
+
+
+def _log_compiles(dispatcher):
+    """numbaのコンパイルが走るたびにログを出す（型の揺れによる再コンパイル検出用）
+    
+    既存の型やディスクキャッシュから読み込んだ場合はログを出さない。
+    ログは logs/ 配下のファイル（compile_YYYYMMDD.log）にも残る
+    """
+    logger = AppLogger("compile")
+    name = dispatcher.py_func.__name__
+    original_compile = dispatcher.compile
+    
+    def _compile_and_log(sig):
+        misses = _cache_misses(dispatcher)
+        entry_point = original_compile(sig)
+        if _cache_misses(dispatcher) > misses:
+            logger.info("compiled %s for %s", name, sig)
+        return entry_point
+    
+    dispatcher.compile = _compile_and_log
+    return dispatcher
+
+
+def optional_njit(**kwargs):
+    """numbaがあれば @njit を、なければ何もしないデコレータを返す
+    
+    環境変数 DAIFUKU_LOG_COMPILES を設定するとコンパイルをログに出す
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return lambda func: func
+    if not os.environ.get('DAIFUKU_LOG_COMPILES'):
+        return njit(**kwargs)
+    return lambda func: _log_compiles(njit(**kwargs)(func))
+
+
+@optional_njit(cache=True)
+def _apply_sale(stock, sales, count, price):
+    """販売後の在庫と売上を計算する"""
+    return stock - count, sales + count * price
+
+
 class DaifukuShop:
     """ふわふわ大福店（ロギング付き）"""
     
@@ -281,10 +688,10 @@ class DaifukuShop:
             self.logger.error(f"在庫不足: 要求{count}個、在庫{self.stock}個")
             return False
         
-        self.stock -= count
-        self.sales += count * price
-        self.logger.info(f"販売成功: {count}個 × {price}円 = {count * price}円")
-        self.logger.info(f"現在の状態: 在庫{self.stock}個、売上{self.sales}円")
+        total = count * price
+        self.stock, self.sales = _apply_sale(self.stock, self.sales, count, price)
+        self.logger.info("販売成功: %s個 × %s円 = %s円", count, price, total)
+        self.logger.info("現在の状態: 在庫%s個、売上%s円", self.stock, self.sales)
         return True
     
     def close_shop(self):
@@ -294,6 +701,7 @@ class DaifukuShop:
         self.logger.info(f"本日の売上: {self.sales}円")
         self.logger.info(f"残り在庫: {self.stock}個")
         self.logger.info("="*40)
+        self.logger.close()
 
 
 # ============================================================
@@ -32,8 +32,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+import functools
 import logging
+from pathlib import Path
 
 
 # ============================================================
@@ -52,6 +53,12 @@ logger = logging.getLogger(__name__)
 # 4. WebDriverの初期化関数
 # ============================================================
 
+@functools.lru_cache(maxsize=1)
+def _get_chromedriver_path():
+    """ChromeDriverのパスを取得する（プロセス内で1回だけ解決）"""
+    return ChromeDriverManager().install()
+
+
 def setup_driver():
     """WebDriverを初期化する関数
     
@@ -66,7 +73,7 @@ def setup_driver():
         logger.info("WebDriverを初期化しています...")
         
         # ChromeDriverのサービスを設定
-        service = Service(ChromeDriverManager().install())
+        service = Service(_get_chromedriver_path())
         
         # WebDriverを作成
         driver = webdriver.Chrome(service=service)
@@ -82,9 +89,24 @@ def setup_driver():
         raise
 
 
-def setup_driver_with_options():
+# よく使うChromeの起動オプション
+_CHROME_OPTIONS_ARGS = [
+    '--start-maximized',  # 最大化で起動
+    '--disable-notifications',  # 通知を無効化
+    '--disable-popup-blocking',  # ポップアップブロック無効化
+]
+
+
+def setup_driver_with_options(headless: bool = True):
     """オプション付きでWebDriverを初期化する関数
     
+    Chromeのプロファイル（キャッシュ・Cookie）は ~/.cache/daifuku_chrome_profile を
+    使い回す。同じプロファイルは同時に1つのChromeしか使えないので、
+    並列で動かす場合はインスタンスごとに別のディレクトリを指定すること。
+    
+    Args:
+        headless: 画面を表示せずに起動するか（画像も読み込まない）
+    
     Returns:
         WebDriver: 初期化済みのWebDriverオブジェクト
     """
@@ -95,24 +117,39 @@ def setup_driver_with_options():
         options = webdriver.ChromeOptions()
         
         # よく使うオプション
-        options.add_argument('--start-maximized')  # 最大化で起動
-        options.add_argument('--disable-notifications')  # 通知を無効化
-        options.add_argument('--disable-popup-blocking')  # ポップアップブロック無効化
+        for arg in _CHROME_OPTIONS_ARGS:
+            options.add_argument(arg)
+        
+        # プロファイルを使い回す（HTTPキャッシュ・JSのコードキャッシュが効く）
+        profile = Path.home() / '.cache/daifuku_chrome_profile'
+        profile.mkdir(parents=True, exist_ok=True)
+        options.add_argument(f'--user-data-dir={profile}')
+        options.add_argument(f'--disk-cache-dir={profile / "disk"}')
         
         # ヘッドレスモード（画面を表示しない）
-        # options.add_argument('--headless')  # 本番環境で使用
+        if headless:
+            options.add_argument('--headless=new')
+            # ヘッドレスでは --start-maximized が効かないので画面サイズを指定
+            options.add_argument('--window-size=1920,1080')
+            # 取得するのはテキストだけなので画像・通知は読み込まない
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+        
+        # DOMContentLoadedで driver.get を返す（残りは WebDriverWait で待つ）
+        options.page_load_strategy = 'eager'
         
         # User-Agentを設定（bot検出を回避）
         # options.add_argument('user-agent=Mozilla/5.0 ...')
         
         # サービスを設定
-        service = Service(ChromeDriverManager().install())
+        service = Service(_get_chromedriver_path())
         
         # WebDriverを作成
         driver = webdriver.Chrome(service=service, options=options)
         
-        # 暗黙的な待機時間を設定（要素が見つかるまで最大10秒待つ）
-        driver.implicitly_wait(10)
+        # 暗黙的な待機は使わない（明示的な待機と混ぜると待ち時間が読めなくなる）
         
         logger.info("WebDriverの初期化が完了しました")
         return driver
@@ -126,6 +163,28 @@ def setup_driver_with_options():
 # 5. 基本的な操作例
 # ============================================================
 
+# よく使うロケーター（検索方法と値の組）
+SEARCH_BOX_LOCATOR = (By.NAME, "q")
+H3_LOCATOR = (By.CSS_SELECTOR, "h3")
+
+
+def wait_ready(driver, by, locator, timeout=10):
+    """要素が現れるまで待って返す（固定のsleepの代わり）
+    
+    Args:
+        driver: WebDriverオブジェクト
+        by: 検索方法（By.NAME など）
+        locator: 検索する値
+        timeout: 最大待ち時間（秒）
+    
+    Returns:
+        WebElement: 見つかった要素
+    """
+    return WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((by, locator))
+    )
+
+
 def example_google_search(driver):
     """Googleで検索する例
     
@@ -137,11 +196,10 @@ def example_google_search(driver):
         
         # Googleを開く
         driver.get("https://www.google.com")
-        time.sleep(2)
         
         # 検索ボックスを見つける
         logger.info("検索ボックスを探しています")
-        search_box = driver.find_element(By.NAME, "q")
+        search_box = wait_ready(driver, *SEARCH_BOX_LOCATOR)
         
         # 検索キーワードを入力
         keyword = "Python Selenium"
@@ -153,17 +211,24 @@ def example_google_search(driver):
         search_box.send_keys(Keys.RETURN)
         
         # 結果が表示されるまで待つ
-        time.sleep(3)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located(H3_LOCATOR)
+        )
         
         # タイトルを取得
         logger.info(f"ページタイトル: {driver.title}")
         
         # 検索結果のタイトルを取得（最初の5件）
         logger.info("検索結果を取得します")
-        results = driver.find_elements(By.CSS_SELECTOR, "h3")
+        # 1回の通信でまとめて取得（要素ごとに .text を呼ぶと毎回通信が発生する）
+        titles = driver.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".slice(0, 5).map(e => e.innerText);",
+            H3_LOCATOR[1]
+        )
         
-        for i, result in enumerate(results[:5], 1):
-            logger.info(f"  {i}. {result.text}")
+        for i, title in enumerate(titles, 1):
+            logger.info("  %d. %s", i, title)
         
         logger.info("検索が完了しました")
     
@@ -188,14 +253,14 @@ def example_wait_for_element(driver):
         
         # 検索ボックスが表示されるまで待つ
         search_box = wait.until(
-            EC.presence_of_element_located((By.NAME, "q"))
+            EC.presence_of_element_located(SEARCH_BOX_LOCATOR)
         )
         
         logger.info("検索ボックスが見つかりました")
         
         # クリック可能になるまで待つ
         clickable_element = wait.until(
-            EC.element_to_be_clickable((By.NAME, "q"))
+            EC.element_to_be_clickable(SEARCH_BOX_LOCATOR)
         )
         
         clickable_element.send_keys("Selenium待機処理")
@@ -218,19 +283,32 @@ class WebAutomation:
     def __init__(self):
         """初期化"""
         self.driver = None
+        self._owns_driver = False
         logger.info("WebAutomationクラスを初期化しました")
     
-    def start(self):
-        """ブラウザを起動"""
-        logger.info("ブラウザを起動します")
-        self.driver = setup_driver_with_options()
+    def start(self, driver=None):
+        """ブラウザを起動
+        
+        Args:
+            driver: 起動済みのWebDriver（渡した場合はそれを使い、stopでは終了しない）
+        """
+        if driver is not None:
+            logger.info("起動済みのブラウザを使います")
+            self.driver = driver
+            self._owns_driver = False
+        else:
+            logger.info("ブラウザを起動します")
+            self.driver = setup_driver_with_options()
+            self._owns_driver = True
     
     def stop(self):
         """ブラウザを終了"""
         if self.driver:
-            logger.info("ブラウザを終了します")
-            self.driver.quit()
+            if self._owns_driver:
+                logger.info("ブラウザを終了します")
+                self.driver.quit()
             self.driver = None
+            self._owns_driver = False
     
     def search_daifuku_recipe(self, keyword: str = "大福 レシピ"):
         """大福のレシピを検索
@@ -246,21 +324,27 @@ class WebAutomation:
             
             # Googleを開く
             self.driver.get("https://www.google.com")
-            time.sleep(2)
             
             # 検索
-            search_box = self.driver.find_element(By.NAME, "q")
+            search_box = wait_ready(self.driver, *SEARCH_BOX_LOCATOR)
             search_box.send_keys(keyword)
             search_box.send_keys(Keys.RETURN)
             
-            time.sleep(3)
+            # 結果が表示されるまで待つ
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_all_elements_located(H3_LOCATOR)
+            )
             
             # 結果を表示
-            results = self.driver.find_elements(By.CSS_SELECTOR, "h3")
-            logger.info(f"{len(results)}件の検索結果が見つかりました")
+            titles = self.driver.execute_script(
+                "return Array.from(document.querySelectorAll(arguments[0]))"
+                ".map(e => e.innerText);",
+                H3_LOCATOR[1]
+            )
+            logger.info(f"{len(titles)}件の検索結果が見つかりました")
             
-            for i, result in enumerate(results[:3], 1):
-                logger.info(f"  {i}. {result.text}")
+            for i, title in enumerate(titles[:3], 1):
+                logger.info("  %d. %s", i, title)
         
         except Exception as e:
             logger.error(f"検索中にエラー: {e}")
@@ -288,6 +372,16 @@ class WebAutomation:
 # 7. メイン処理
 # ============================================================
 
+def reset_driver(driver):
+    """次の処理のためにCookieを消して空白ページに戻す
+    
+    Args:
+        driver: WebDriverオブジェクト
+    """
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
 def main():
     """メイン処理"""
     
@@ -295,49 +389,41 @@ def main():
     print("Selenium初期設定完全ガイド")
     print("=" * 60)
     
-    # 方法1: シンプルな初期化
-    print("\n【方法1: シンプルな初期化】")
-    driver1 = setup_driver()
+    # ブラウザは1つだけ起動して、3つの例で使い回す
+    driver = setup_driver_with_options()
     
     try:
-        # Google検索の例
-        example_google_search(driver1)
+        # 方法1: Google検索
+        print("\n【方法1: Google検索】")
+        example_google_search(driver)
         
         # スクリーンショット
-        driver1.save_screenshot("google_search.png")
+        driver.save_screenshot("google_search.png")
         logger.info("スクリーンショットを保存: google_search.png")
+        
+        reset_driver(driver)
+        
+        # 方法2: 待機処理
+        print("\n【方法2: 待機処理】")
+        example_wait_for_element(driver)
+        
+        reset_driver(driver)
+        
+        # 方法3: クラスを使った自動化
+        print("\n【方法3: クラスを使った自動化】")
+        automation = WebAutomation()
+        
+        try:
+            automation.start(driver=driver)
+            automation.search_daifuku_recipe("ふわふわ大福 作り方")
+            automation.take_screenshot("daifuku_search.png")
+        
+        finally:
+            automation.stop()
     
     finally:
         logger.info("ブラウザを終了します")
-        driver1.quit()
-    
-    time.sleep(2)
-    
-    # 方法2: オプション付き初期化
-    print("\n【方法2: オプション付き初期化】")
-    driver2 = setup_driver_with_options()
-    
-    try:
-        # 待機処理の例
-        example_wait_for_element(driver2)
-    
-    finally:
-        logger.info("ブラウザを終了します")
-        driver2.quit()
-    
-    time.sleep(2)
-    
-    # 方法3: クラスを使った自動化
-    print("\n【方法3: クラスを使った自動化】")
-    automation = WebAutomation()
-    
-    try:
-        automation.start()
-        automation.search_daifuku_recipe("ふわふわ大福 作り方")
-        automation.take_screenshot("daifuku_search.png")
-    
-    finally:
-        automation.stop()
+        driver.quit()
     
     print("\n" + "=" * 60)
     print("すべての処理が完了しました")